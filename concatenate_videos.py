@@ -8,14 +8,26 @@ into a single video file using ffmpeg.
 
 import os
 import sys
-import argparse
+import functools
+import shutil
 import subprocess
-import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+try:
+    from .ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path, run_ffmpeg
+except ImportError:
+    # Run as a standalone script rather than as part of the package
+    from ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path, run_ffmpeg
 
-def find_mp4_files(folder_path: str, sort_method: str = "alphabetical") -> List[Path]:
+# Translation table converting Windows path separators for ffmpeg
+FORWARD_SLASH_TABLE = str.maketrans('\\', '/')
+
+# Video stream properties that must match for stream-copy concatenation
+CODEC_PARAM_FIELDS = 'codec_name,width,height,pix_fmt,r_frame_rate'
+
+
+def find_mp4_files(folder_path: str, sort_method: str = "alphabetical") -> List[Tuple[Path, os.stat_result]]:
     """
     Find all .mp4 files in the given folder and sort them.
     
@@ -24,7 +36,8 @@ def find_mp4_files(folder_path: str, sort_method: str = "alphabetical") -> List[
         sort_method: Method to sort files ("alphabetical", "date_created", "date_modified")
     
     Returns:
-        List of Path objects for MP4 files
+        List of (Path, stat result) tuples for MP4 files, so callers can use
+        file metadata without issuing another stat
     """
     folder = Path(folder_path)
     
@@ -34,22 +47,23 @@ def find_mp4_files(folder_path: str, sort_method: str = "alphabetical") -> List[
     if not folder.is_dir():
         raise NotADirectoryError(f"Path is not a directory: {folder_path}")
     
-    # Find all .mp4 files (case insensitive)
-    mp4_files = []
-    for file_path in folder.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() == '.mp4':
-            mp4_files.append(file_path)
+    # Find all .mp4 files (case insensitive). The cheap name test runs first,
+    # and DirEntry.is_file() answers from the directory listing for regular
+    # files. Each match is stat'ed exactly once and the result travels with it.
+    with os.scandir(folder_path) as it:
+        mp4_files = [(Path(entry.path), entry.stat()) for entry in it
+                     if entry.name.lower().endswith('.mp4') and entry.is_file()]
     
     if not mp4_files:
         raise ValueError(f"No MP4 files found in folder: {folder_path}")
     
     # Sort files based on the specified method
     if sort_method == "alphabetical":
-        mp4_files.sort(key=lambda x: x.name.lower())
+        mp4_files.sort(key=lambda x: x[0].name.lower())
     elif sort_method == "date_created":
-        mp4_files.sort(key=lambda x: x.stat().st_ctime)
+        mp4_files.sort(key=lambda x: x[1].st_ctime)
     elif sort_method == "date_modified":
-        mp4_files.sort(key=lambda x: x.stat().st_mtime)
+        mp4_files.sort(key=lambda x: x[1].st_mtime)
     else:
         raise ValueError(f"Invalid sort method: {sort_method}")
     
@@ -63,92 +77,289 @@ def check_ffmpeg() -> bool:
     Returns:
         True if ffmpeg is available, False otherwise
     """
-    try:
-        subprocess.run(['ffmpeg', '-version'], 
-                      capture_output=True, 
-                      check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    return get_ffmpeg_path() is not None
+
+
+@functools.lru_cache(maxsize=None)
+def get_ffprobe_path() -> Optional[str]:
+    """
+    Resolve the ffprobe executable from the system PATH.
+    
+    Returns:
+        Absolute path to ffprobe, or None if it is not available
+    """
+    return shutil.which('ffprobe')
+
+
+def probe_codec_params(paths: List[Path]) -> List[Optional[Dict[str, object]]]:
+    """
+    Read the video codec parameters of each file with ffprobe.
+    
+    Files are probed concurrently, one ffprobe process per file.
+    
+    Args:
+        paths: List of video file paths
+    
+    Returns:
+        Parameters of the first video stream for each file, in input order,
+        or None for files that could not be probed
+    """
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    
+    ffprobe = get_ffprobe_path()
+    if ffprobe is None:
+        return [None] * len(paths)
+    
+    def probe(path: Path) -> Optional[Dict[str, object]]:
+        result = subprocess.run([
+            ffprobe,
+            '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', f'stream={CODEC_PARAM_FIELDS}',
+            '-of', 'json',
+            str(path)
+        ], capture_output=True, text=True, **POPEN_KWARGS)
+        if result.returncode != 0:
+            return None
+        try:
+            streams = json.loads(result.stdout).get('streams')
+        except ValueError:
+            return None
+        return streams[0] if streams else None
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(len(paths), os.cpu_count() or 1))) as executor:
+        return list(executor.map(probe, paths))
 
 
-def create_concat_file(mp4_files: List[Path], temp_dir: str) -> str:
+def create_concat_list(mp4_files: List[Path]) -> bytes:
     """
-    Create a temporary file listing all videos to concatenate.
+    Build the ffmpeg concat demuxer list of all videos to concatenate.
     
     Args:
         mp4_files: List of MP4 file paths
-        temp_dir: Temporary directory path
     
     Returns:
-        Path to the temporary concat file
+        UTF-8 encoded concat list, fed to ffmpeg through its standard input
     """
-    concat_file_path = os.path.join(temp_dir, 'concat_list.txt')
+    lines = []
+    for mp4_file in mp4_files:
+        # Get absolute path (lexically, without resolving symlinks) and
+        # convert to forward slashes for ffmpeg
+        abs_path = os.path.abspath(mp4_file).translate(FORWARD_SLASH_TABLE)
+        # Escape single quotes in file paths for ffmpeg
+        escaped_path = abs_path.replace("'", r"\'")
+        lines.append(f"file '{escaped_path}'\n")
+    
+    return ''.join(lines).encode('utf-8')
+
+
+def build_concat_command(output_path: str) -> List[str]:
+    """
+    Build the ffmpeg command that concatenates the list read from stdin.
+    
+    Args:
+        output_path: Path for the output concatenated video
+    
+    Returns:
+        ffmpeg command line
+    """
+    return [
+        get_ffmpeg_path() or 'ffmpeg',
+        '-f', 'concat',
+        '-safe', '0',
+        '-protocol_whitelist', 'file,pipe',
+        '-i', 'pipe:0',
+        '-c', 'copy',  # Copy streams without re-encoding for speed
+        '-y',  # Overwrite output file if it exists
+        output_path
+    ]
+
+
+def default_output_path(folder_path: str) -> str:
+    """
+    Build the default output filename for a folder.
+    
+    Args:
+        folder_path: Path to the folder containing MP4 files
+    
+    Returns:
+        Output filename of the form output/[INPUT_FOLDER_NAME].mp4
+    """
+    # Get the folder name from the input path, only resolving it
+    # against the working directory for names like "." or ".."
+    folder_name = Path(folder_path).name
+    if folder_name in ('', '..'):
+        folder_name = os.path.basename(os.path.abspath(folder_path))
+    return f"output/{folder_name}.mp4"
+
+
+def log_message(message: str = "", label: Optional[str] = None) -> None:
+    """
+    Print a progress message, optionally prefixing every line with a label.
+    
+    In batch mode several folders run at once, so each line names its
+    folder and the whole message is written in a single call.
+    
+    Args:
+        message: Message to print, possibly spanning several lines
+        label: Optional job label, such as the folder being processed
+    """
+    if label is None:
+        print(message)
+        return
+    
+    lines = [f"[{label}] {line}" if line else line for line in message.split("\n")]
+    print("\n".join(lines) + "\n", end="")
+
+
+def report_codec_mismatches(paths: List[Path], label: Optional[str] = None) -> None:
+    """
+    Warn about input files whose video parameters differ.
+    
+    Stream copy only works cleanly when every input shares the same video
+    parameters. Files are compared against the first one ffprobe could read.
+    
+    Args:
+        paths: List of MP4 file paths to concatenate
+        label: Optional job label prefixed to every printed line
+    """
+    if get_ffprobe_path() is None:
+        log_message("\n⚠️  Warning: ffprobe is not available, skipping the codec check", label)
+        return
+    
+    codec_params = probe_codec_params(paths)
+    probed = [(path, params) for path, params in zip(paths, codec_params) if params is not None]
+    unreadable = [path.name for path, params in zip(paths, codec_params) if params is None]
     
-    with open(concat_file_path, 'w', encoding='utf-8') as f:
-        for mp4_file in mp4_files:
-            # Get absolute path and convert to forward slashes for ffmpeg
-            abs_path = str(mp4_file.resolve()).replace('\\', '/')
-            # Escape single quotes in file paths for ffmpeg
-            escaped_path = abs_path.replace("'", r"\'")
-            f.write(f"file '{escaped_path}'\n")
+    if probed:
+        reference_path, reference = probed[0]
+        mismatched = [path.name for path, params in probed if params != reference]
+        if mismatched:
+            log_message(f"\n⚠️  Warning: these files have different video parameters than {reference_path.name}:", label)
+            for name in mismatched:
+                log_message(f"  - {name}", label)
+            log_message("The concatenated video may not play back correctly.", label)
     
-    return concat_file_path
+    if unreadable:
+        log_message("\n⚠️  Warning: could not read the video parameters of:", label)
+        for name in unreadable:
+            log_message(f"  - {name}", label)
 
 
-def concatenate_videos(mp4_files: List[Path], output_path: str) -> bool:
+def concatenate_videos(mp4_files: List[Tuple[Path, os.stat_result]], output_path: str,
+                       check_codecs: bool = False, label: Optional[str] = None) -> bool:
     """
     Concatenate MP4 files using ffmpeg.
     
     Args:
-        mp4_files: List of MP4 file paths to concatenate
+        mp4_files: List of (Path, stat result) tuples as returned by find_mp4_files
         output_path: Path for the output concatenated video
+        check_codecs: Probe the inputs with ffprobe and warn if their video
+            parameters differ
+        label: Optional job label prefixed to every printed line, used when
+            several folders are concatenated at once
     
     Returns:
         True if successful, False otherwise
     """
-    print(f"Found {len(mp4_files)} MP4 files to concatenate:")
-    for i, file_path in enumerate(mp4_files, 1):
-        print(f"  {i}. {file_path.name}")
+    log_message(f"Found {len(mp4_files)} MP4 files to concatenate:", label)
+    for i, (file_path, file_stat) in enumerate(mp4_files, 1):
+        log_message(f"  {i}. {file_path.name} ({file_stat.st_size / (1024 * 1024):.1f} MB)", label)
     
-    print(f"\nConcatenating videos into: {output_path}")
+    paths = [file_path for file_path, _ in mp4_files]
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Create the concat file
-            concat_file_path = create_concat_file(mp4_files, temp_dir)
-            
-            # Run ffmpeg concatenation
-            cmd = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', concat_file_path,
-                '-c', 'copy',  # Copy streams without re-encoding for speed
-                '-y',  # Overwrite output file if it exists
-                output_path
-            ]
-            
-            print("\nRunning ffmpeg concatenation...")
-            print(f"Command: {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"\n✅ Successfully concatenated videos to: {output_path}")
-                return True
-            else:
-                print(f"\n❌ Error during concatenation:")
-                print(f"Error output: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"\n❌ Error during concatenation: {str(e)}")
+    try:
+        if check_codecs:
+            report_codec_mismatches(paths, label)
+        
+        log_message(f"\nConcatenating videos into: {output_path}", label)
+        
+        # Build the concat list; ffmpeg reads it from stdin instead of a file
+        concat_list = create_concat_list(paths)
+        
+        # Run ffmpeg concatenation
+        cmd = build_concat_command(output_path)
+        
+        log_message("\nRunning ffmpeg concatenation...", label)
+        log_message(f"Command: {' '.join(cmd)}", label)
+        
+        returncode, error_output = run_ffmpeg(cmd, concat_list)
+        
+        if returncode == 0:
+            log_message(f"\n✅ Successfully concatenated videos to: {output_path}", label)
+            return True
+        else:
+            log_message(f"\n❌ Error during concatenation into {output_path}:", label)
+            log_message(f"Error output: {error_output}", label)
             return False
+            
+    except Exception as e:
+        log_message(f"\n❌ Error during concatenation into {output_path}: {str(e)}", label)
+        return False
+
+
+def concatenate_folder(folder_path: str, sort_method: str, check_codecs: bool = False) -> bool:
+    """
+    Concatenate the MP4 files of one folder into its default output path.
+    
+    Args:
+        folder_path: Path to the folder containing MP4 files
+        sort_method: Method to sort files ("alphabetical", "date_created", "date_modified")
+        check_codecs: Probe the inputs with ffprobe and warn if their video
+            parameters differ
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        mp4_files = find_mp4_files(folder_path, sort_method)
+        
+        # Ensure output directory exists
+        output_path = os.path.abspath(default_output_path(folder_path))
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    except Exception as e:
+        log_message(f"❌ Error: {str(e)}", folder_path)
+        return False
+    
+    return concatenate_videos(mp4_files, output_path, check_codecs, label=folder_path)
+
+
+def concatenate_folders(folders: List[str], sort_method: str, jobs: int,
+                        check_codecs: bool = False) -> bool:
+    """
+    Concatenate the MP4 files of several folders concurrently.
+    
+    Each folder is written to its default output path, with up to `jobs`
+    ffmpeg processes running at the same time.
+    
+    Args:
+        folders: Paths to folders containing MP4 files
+        sort_method: Method to sort files ("alphabetical", "date_created", "date_modified")
+        jobs: Maximum number of concurrent ffmpeg processes
+        check_codecs: Probe the inputs with ffprobe and warn if their video
+            parameters differ
+    
+    Returns:
+        True if every folder was concatenated successfully, False otherwise
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(
+            lambda folder: concatenate_folder(folder, sort_method, check_codecs), folders
+        ))
+    
+    succeeded = sum(results)
+    print(f"\nConcatenated {succeeded} of {len(folders)} folders")
+    return succeeded == len(folders)
 
 
 def main():
     """Main function to handle command line arguments and execute concatenation."""
+    # Only needed for the command line, so keep it out of module import
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Concatenate all MP4 files in a folder into a single video",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -157,12 +368,16 @@ Examples:
   python concatenate_videos.py "C:\\Videos\\ToMerge"  # Output: output/ToMerge.mp4
   python concatenate_videos.py "/home/user/videos" --output "output/merged.mp4"
   python concatenate_videos.py "./videos" --sort date_created
+  python concatenate_videos.py "./day1" "./day2" "./day3" --jobs 2  # Batch mode
         """
     )
     
     parser.add_argument(
-        'folder',
-        help='Path to folder containing MP4 files to concatenate'
+        'folders',
+        nargs='+',
+        metavar='folder',
+        help='Path to folder containing MP4 files to concatenate; '
+             'several folders are processed concurrently, one output file each'
     )
     
     parser.add_argument(
@@ -178,23 +393,54 @@ Examples:
         help='Method to sort files before concatenation (default: alphabetical)'
     )
     
+    parser.add_argument(
+        '--check-codecs',
+        action='store_true',
+        help='Probe inputs with ffprobe first and warn if their video parameters differ'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help='Maximum concurrent concatenations when several folders are given '
+             '(default: number of folders, capped at the CPU count)'
+    )
+    
     args = parser.parse_args()
     
+    if len(args.folders) > 1:
+        if args.output is not None:
+            parser.error("--output can only be used with a single folder")
+        
+        output_names = [os.path.abspath(default_output_path(folder)) for folder in args.folders]
+        if len(set(output_names)) != len(output_names):
+            parser.error("folders must have distinct names, since each is written to output/[INPUT_FOLDER_NAME].mp4")
+    
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    
     # Check if ffmpeg is available
     if not check_ffmpeg():
         print("❌ Error: ffmpeg is not installed or not available in system PATH")
         print("Please install ffmpeg and ensure it's accessible from command line")
         sys.exit(1)
     
+    # Batch mode: run one ffmpeg per folder concurrently
+    if len(args.folders) > 1:
+        jobs = args.jobs or min(len(args.folders), os.cpu_count() or 1)
+        success = concatenate_folders(args.folders, args.sort, jobs, args.check_codecs)
+        sys.exit(0 if success else 1)
+    
+    folder = args.folders[0]
+    
     try:
         # Find MP4 files
-        mp4_files = find_mp4_files(args.folder, args.sort)
+        mp4_files = find_mp4_files(folder, args.sort)
         
         # Generate output path if not specified
         if args.output is None:
-            # Get the folder name from the input path
-            folder_name = os.path.basename(os.path.abspath(args.folder))
-            args.output = f"output/{folder_name}.mp4"
+            args.output = default_output_path(folder)
         
         # Create output path (absolute)
         output_path = os.path.abspath(args.output)
@@ -204,7 +450,7 @@ Examples:
         os.makedirs(output_dir, exist_ok=True)
         
         # Concatenate videos
-        success = concatenate_videos(mp4_files, output_path)
+        success = concatenate_videos(mp4_files, output_path, args.check_codecs)
         
         if success:
             sys.exit(0)
@@ -7,39 +7,102 @@ Uses ffmpeg to generate simple logo/watermark images.
 import os
 import subprocess
 import sys
+from typing import List, Tuple
 
+try:
+    from .ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path
+except ImportError:
+    # Run as a standalone script rather than as part of the package
+    from ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path
 
-def create_test_logo(output_path: str, text: str = "LOGO", width: int = 200, height: int = 100, color: str = "red") -> bool:
+
+def test_logo_source(text: str = "LOGO", width: int = 200, height: int = 100, color: str = "red") -> Tuple[str, str]:
     """
-    Create a test logo image using ffmpeg.
+    Build the ffmpeg source and filter for a test logo image.
     
     Args:
-        output_path: Path where the logo image will be saved
         text: Text to display in the logo
         width: Width of the logo
         height: Height of the logo
         color: Background color of the logo
     
     Returns:
-        True if successful, False otherwise
+        Tuple of (lavfi source, video filter)
+    """
+    return (
+        f'color={color}:size={width}x{height}:duration=1',
+        f'drawtext=fontsize=24:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:text={text}'
+    )
+
+
+def transparent_watermark_source(text: str = "WATERMARK", size: int = 300) -> Tuple[str, str]:
+    """
+    Build the ffmpeg source and filter for a transparent watermark image.
+    
+    Args:
+        text: Text to display in the watermark
+        size: Size of the square watermark
+    
+    Returns:
+        Tuple of (lavfi source, video filter)
+    """
+    return (
+        f'color=c=black@0.0:s={size}x{size}:d=1',
+        f'drawtext=fontsize=36:fontcolor=white@0.8:x=(w-text_w)/2:y=(h-text_h)/2:text={text}'
+    )
+
+
+def render_images(images: List[Tuple[str, str, str]]) -> bool:
+    """
+    Render one or more still images with a single ffmpeg process.
+    
+    Every image becomes one lavfi input and one output of the same command,
+    so ffmpeg starts and initialises the PNG encoder only once.
+    
+    Args:
+        images: List of (output path, lavfi source, video filter) tuples
+    
+    Returns:
+        True if all images were created, False otherwise
     """
     cmd = [
-        'ffmpeg',
-        '-f', 'lavfi',
-        '-i', f'color={color}:size={width}x{height}:duration=1',
-        '-vf', f'drawtext=fontsize=24:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:text={text}',
-        '-frames:v', '1',
+        get_ffmpeg_path() or 'ffmpeg',
         '-y',  # Overwrite if exists
-        output_path
     ]
+    for _, source, _ in images:
+        cmd += ['-f', 'lavfi', '-i', source]
+    
+    cmd += ['-filter_complex', ';'.join(
+        f'[{i}:v]{video_filter}[out{i}]' for i, (_, _, video_filter) in enumerate(images)
+    )]
+    
+    for i, (output_path, _, _) in enumerate(images):
+        cmd += ['-map', f'[out{i}]', '-frames:v', '1', output_path]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, **POPEN_KWARGS)
         return result.returncode == 0
     except Exception:
         return False
 
 
+def create_test_logo(output_path: str, text: str = "LOGO", width: int = 200, height: int = 100, color: str = "red") -> bool:
+    """
+    Create a test logo image using ffmpeg.
+    
+    Args:
+        output_path: Path where the logo image will be saved
+        text: Text to display in the logo
+        width: Width of the logo
+        height: Height of the logo
+        color: Background color of the logo
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    return render_images([(output_path, *test_logo_source(text, width, height, color))])
+
+
 def create_transparent_watermark(output_path: str, text: str = "WATERMARK", size: int = 300) -> bool:
     """
     Create a transparent watermark PNG using ffmpeg.
@@ -52,21 +115,7 @@ def create_transparent_watermark(output_path: str, text: str = "WATERMARK", size
     Returns:
         True if successful, False otherwise
     """
-    cmd = [
-        'ffmpeg',
-        '-f', 'lavfi',
-        '-i', f'color=c=black@0.0:s={size}x{size}:d=1',
-        '-vf', f'drawtext=fontsize=36:fontcolor=white@0.8:x=(w-text_w)/2:y=(h-text_h)/2:text={text}',
-        '-frames:v', '1',
-        '-y',  # Overwrite if exists
-        output_path
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode == 0
-    except Exception:
-        return False
+    return render_images([(output_path, *transparent_watermark_source(text, size))])
 
 
 def main():
@@ -79,20 +128,17 @@ def main():
     
     # Create test images
     test_images = [
-        ("logo.png", lambda: create_test_logo(
-            os.path.join(test_dir, "logo.png"), 
+        ("logo.png", test_logo_source(
             text="MY LOGO", 
             width=150, 
             height=80, 
             color="blue"
         )),
-        ("watermark.png", lambda: create_transparent_watermark(
-            os.path.join(test_dir, "watermark.png"), 
+        ("watermark.png", transparent_watermark_source(
             text="WATERMARK", 
             size=200
         )),
-        ("small_logo.png", lambda: create_test_logo(
-            os.path.join(test_dir, "small_logo.png"), 
+        ("small_logo.png", test_logo_source(
             text="©", 
             width=50, 
             height=50, 
@@ -100,15 +146,18 @@ def main():
         ))
     ]
     
-    created_images = []
-    for filename, create_func in test_images:
+    for filename, _ in test_images:
         print(f"Creating {filename}...")
-        
-        if create_func():
+    
+    # Render all images with a single ffmpeg process
+    created_images = []
+    if render_images([(os.path.join(test_dir, filename), source, video_filter)
+                      for filename, (source, video_filter) in test_images]):
+        for filename, _ in test_images:
             print(f"✅ Created {filename}")
             created_images.append(filename)
-        else:
-            print(f"❌ Failed to create {filename}")
+    else:
+        print("❌ Failed to create test images")
     
     if created_images:
         print(f"\n✅ Created {len(created_images)} test images in '{test_dir}' folder")
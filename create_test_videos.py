@@ -9,37 +9,66 @@ import subprocess
 import tempfile
 import sys
 from pathlib import Path
+from typing import List, Tuple
 
+try:
+    from .ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path
+except ImportError:
+    # Run as a standalone script rather than as part of the package
+    from ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path
 
-def create_test_video(output_path: str, duration: int = 5, color: str = "red", text: str = "Test") -> bool:
+
+def render_test_videos(videos: List[Tuple[str, int, str, str]]) -> bool:
     """
-    Create a test video file using ffmpeg.
+    Create one or more test videos with a single ffmpeg process.
+    
+    Every video becomes one lavfi input and one output of the same command,
+    so ffmpeg and its encoders start only once for the whole batch.
     
     Args:
-        output_path: Path where the test video will be saved
-        duration: Duration of the video in seconds
-        color: Background color of the test video
-        text: Text to display in the video
+        videos: List of (output path, duration in seconds, background color, text) tuples
     
     Returns:
-        True if successful, False otherwise
+        True if all videos were created, False otherwise
     """
     cmd = [
-        'ffmpeg',
-        '-f', 'lavfi',
-        '-i', f'color={color}:size=640x480:duration={duration}',
-        '-vf', f'drawtext=fontsize=30:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:text={text}',
+        get_ffmpeg_path() or 'ffmpeg',
         '-y',  # Overwrite if exists
-        output_path
     ]
+    for _, duration, color, _ in videos:
+        cmd += ['-f', 'lavfi', '-i', f'color={color}:size=640x480:duration={duration}']
+    
+    cmd += ['-filter_complex', ';'.join(
+        f'[{i}:v]drawtext=fontsize=30:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:text={text}[out{i}]'
+        for i, (_, _, _, text) in enumerate(videos)
+    )]
+    
+    for i, (output_path, _, _, _) in enumerate(videos):
+        cmd += ['-map', f'[out{i}]', output_path]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, **POPEN_KWARGS)
         return result.returncode == 0
     except Exception:
         return False
 
 
+def create_test_video(output_path: str, duration: int = 5, color: str = "red", text: str = "Test") -> bool:
+    """
+    Create a test video file using ffmpeg.
+    
+    Args:
+        output_path: Path where the test video will be saved
+        duration: Duration of the video in seconds
+        color: Background color of the test video
+        text: Text to display in the video
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    return render_test_videos([(output_path, duration, color, text)])
+
+
 def main():
     """Create test videos and demonstrate the concatenation utility."""
     print("Creating test videos for concatenation demo...")
@@ -55,16 +84,18 @@ def main():
         ("video3_outro.mp4", "blue", "Video 3 - Outro")
     ]
     
-    created_videos = []
-    for filename, color, text in test_videos:
-        video_path = os.path.join(test_dir, filename)
+    for filename, _, _ in test_videos:
         print(f"Creating {filename}...")
-        
-        if create_test_video(video_path, duration=3, color=color, text=text):
+    
+    # Render all videos with a single ffmpeg process
+    created_videos = []
+    if render_test_videos([(os.path.join(test_dir, filename), 3, color, text)
+                           for filename, color, text in test_videos]):
+        for filename, _, _ in test_videos:
             print(f"✅ Created {filename}")
             created_videos.append(filename)
-        else:
-            print(f"❌ Failed to create {filename}")
+    else:
+        print("❌ Failed to create test videos")
     
     if created_videos:
         print(f"\n✅ Created {len(created_videos)} test videos in '{test_dir}' folder")
@@ -0,0 +1,89 @@
+"""
+Shared ffmpeg helpers
+
+Small utilities used by the video scripts to locate and run ffmpeg.
+"""
+
+import collections
+import functools
+import io
+import os
+import shutil
+import subprocess
+import threading
+from typing import IO, List, Optional, Tuple
+
+# Number of trailing ffmpeg log lines kept for error reporting
+FFMPEG_LOG_TAIL_LINES = 200
+
+# Extra arguments for every ffmpeg/ffprobe subprocess. On POSIX, leaving
+# close_fds off lets CPython start the child with posix_spawn instead of
+# fork+exec, and nothing leaks because Python's own descriptors are
+# non-inheritable. On Windows it would make children started at the same
+# time inherit each other's pipe handles, so the default is kept there.
+POPEN_KWARGS = {'close_fds': False} if os.name == 'posix' else {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_ffmpeg_path() -> Optional[str]:
+    """
+    Resolve the ffmpeg executable from the system PATH.
+    
+    The result is cached so every ffmpeg invocation reuses the same
+    absolute path instead of searching PATH again.
+    
+    Returns:
+        Absolute path to ffmpeg, or None if it is not available
+    """
+    return shutil.which('ffmpeg')
+
+
+def _write_input(stream: IO[bytes], data: bytes) -> None:
+    """
+    Write data to a child process pipe in a single call and close it.
+    
+    Args:
+        stream: Writable pipe connected to the child's standard input
+        data: Bytes to write
+    """
+    try:
+        stream.write(data)
+        stream.close()
+    except OSError:
+        # ffmpeg exited early; its log output reports the reason
+        pass
+
+
+def run_ffmpeg(cmd: List[str], input_data: Optional[bytes] = None) -> Tuple[int, str]:
+    """
+    Run an ffmpeg command, keeping only the tail of its log output.
+    
+    ffmpeg reports progress on stderr for the whole run, so the output is
+    streamed and only the last lines are kept for error reporting.
+    
+    Args:
+        cmd: ffmpeg command line to execute
+        input_data: Optional bytes to feed to ffmpeg's standard input
+    
+    Returns:
+        Tuple of (return code, last lines of ffmpeg's stderr output)
+    """
+    with subprocess.Popen(cmd,
+                          stdin=subprocess.DEVNULL if input_data is None else subprocess.PIPE,
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE,
+                          bufsize=io.DEFAULT_BUFFER_SIZE,
+                          **POPEN_KWARGS) as proc:
+        # Feed stdin from a separate thread so a full stderr pipe can't deadlock
+        writer = None
+        if input_data is not None:
+            writer = threading.Thread(target=_write_input, args=(proc.stdin, input_data))
+            writer.start()
+        
+        stderr = io.TextIOWrapper(proc.stderr, encoding='utf-8', errors='replace')
+        tail = collections.deque(stderr, maxlen=FFMPEG_LOG_TAIL_LINES)
+        
+        if writer is not None:
+            writer.join()
+    
+    return proc.returncode, ''.join(tail)
@@ -8,10 +8,40 @@ using ffmpeg with various positioning and scaling options.
 
 import os
 import sys
-import argparse
+import functools
 import subprocess
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+try:
+    from .ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path, run_ffmpeg
+except ImportError:
+    # Run as a standalone script rather than as part of the package
+    from ffmpeg_utils import POPEN_KWARGS, get_ffmpeg_path, run_ffmpeg
+
+# Supported input file extensions
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv', '.m4v'})
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp'})
+
+# Overlay position expressions by preset, with {x}/{y} standing for the offsets
+POSITION_TEMPLATES = {
+    'top-left': '{x}:{y}',
+    'top-right': 'main_w-overlay_w-{x}:{y}',
+    'bottom-left': '{x}:main_h-overlay_h-{y}',
+    'bottom-right': 'main_w-overlay_w-{x}:main_h-overlay_h-{y}',
+    'center': '(main_w-overlay_w)/2:(main_h-overlay_h)/2',
+    'custom': '{x}:{y}'
+}
+
+# Hardware H.264 encoders in order of preference, with their encoder options
+HW_ENCODERS = [
+    ('h264_nvenc', ['-preset', 'p4']),
+    ('h264_qsv', ['-preset', 'faster']),
+    ('h264_videotoolbox', []),
+]
+
+# Output containers that can hold the H.264 streams the hardware encoders produce
+H264_CONTAINER_EXTENSIONS = frozenset({'.mp4', '.m4v', '.mov', '.mkv', '.flv', '.avi'})
 
 
 def check_ffmpeg() -> bool:
@@ -21,13 +51,54 @@ def check_ffmpeg() -> bool:
     Returns:
         True if ffmpeg is available, False otherwise
     """
+    return get_ffmpeg_path() is not None
+
+
+@functools.lru_cache(maxsize=None)
+def detect_hw_encoder() -> Optional[Tuple[str, List[str]]]:
+    """
+    Find a hardware H.264 encoder that works on this system.
+    
+    An encoder being compiled into ffmpeg doesn't mean the matching device is
+    present, so each candidate is confirmed with a tiny test encode. The
+    result is cached for the lifetime of the process.
+    
+    Returns:
+        Tuple of (encoder name, encoder options), or None if no hardware
+        encoder is usable
+    """
+    ffmpeg = get_ffmpeg_path()
+    if ffmpeg is None:
+        return None
+    
     try:
-        subprocess.run(['ffmpeg', '-version'], 
-                      capture_output=True, 
-                      check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        result = subprocess.run([ffmpeg, '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, **POPEN_KWARGS)
+    except OSError:
+        return None
+    
+    available = set()
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            available.add(fields[1])
+    
+    for encoder, options in HW_ENCODERS:
+        if encoder not in available:
+            continue
+        
+        test = subprocess.run(
+            [ffmpeg, '-hide_banner',
+             '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+             '-c:v', encoder] + options + ['-f', 'null', '-'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **POPEN_KWARGS
+        )
+        if test.returncode == 0:
+            return encoder, options
+    
+    return None
 
 
 def validate_files(video_path: str, image_path: str) -> Tuple[Path, Path]:
@@ -56,13 +127,11 @@ def validate_files(video_path: str, image_path: str) -> Tuple[Path, Path]:
         raise FileNotFoundError(f"Image file does not exist: {image_path}")
     
     # Check video file extension
-    video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv', '.m4v'}
-    if video_file.suffix.lower() not in video_extensions:
+    if video_file.suffix.lower() not in VIDEO_EXTENSIONS:
         raise ValueError(f"Unsupported video format: {video_file.suffix}")
     
     # Check image file extension
-    image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp'}
-    if image_file.suffix.lower() not in image_extensions:
+    if image_file.suffix.lower() not in IMAGE_EXTENSIONS:
         raise ValueError(f"Unsupported image format: {image_file.suffix}")
     
     return video_file, image_file
@@ -80,16 +149,8 @@ def get_position_filter(position: str, offset_x: int = 10, offset_y: int = 10) -
     Returns:
         Position filter string for ffmpeg
     """
-    position_map = {
-        'top-left': f'{offset_x}:{offset_y}',
-        'top-right': f'main_w-overlay_w-{offset_x}:{offset_y}',
-        'bottom-left': f'{offset_x}:main_h-overlay_h-{offset_y}',
-        'bottom-right': f'main_w-overlay_w-{offset_x}:main_h-overlay_h-{offset_y}',
-        'center': '(main_w-overlay_w)/2:(main_h-overlay_h)/2',
-        'custom': f'{offset_x}:{offset_y}'
-    }
-    
-    return position_map.get(position, position_map['top-right'])
+    template = POSITION_TEMPLATES.get(position, POSITION_TEMPLATES['top-right'])
+    return template.format(x=offset_x, y=offset_y)
 
 
 def overlay_image_on_video(
@@ -102,7 +163,8 @@ def overlay_image_on_video(
     offset_x: int = 10,
     offset_y: int = 10,
     start_time: Optional[str] = None,
-    duration: Optional[str] = None
+    duration: Optional[str] = None,
+    hw_encode: bool = False
 ) -> bool:
     """
     Overlay an image onto a video using ffmpeg.
@@ -118,6 +180,7 @@ def overlay_image_on_video(
         offset_y: Y offset from edge or absolute Y position for custom
         start_time: Start time for overlay (e.g., '00:00:10')
         duration: Duration of overlay (e.g., '00:00:30')
+        hw_encode: Decode and encode with GPU hardware when available
     
     Returns:
         True if successful, False otherwise
@@ -130,28 +193,31 @@ def overlay_image_on_video(
     # Build the filter complex
     filter_parts = []
     
+    # Pre-process the overlay image in a single filter chain, leaving out
+    # stages that would not change it
+    image_filters = []
+    
     # Scale the overlay image if specified
     if scale:
         if scale.endswith('%'):
             # Handle percentage scaling
             scale_factor = float(scale[:-1]) / 100
-            scale_filter = f"scale=iw*{scale_factor}:ih*{scale_factor}"
-        else:
+            if scale_factor != 1.0:
+                image_filters.append(f"scale=iw*{scale_factor}:ih*{scale_factor}")
+        elif scale != 'iw:ih':
             # Handle explicit dimensions
-            scale_filter = f"scale={scale}"
-        filter_parts.append(f"[1:v]{scale_filter}[scaled]")
-        overlay_input = "[scaled]"
-    else:
-        overlay_input = "[1:v]"
+            image_filters.append(f"scale={scale}")
     
     # Set opacity if not fully opaque
     if opacity < 1.0:
-        if scale:
-            filter_parts.append(f"[scaled]format=rgba,colorchannelmixer=aa={opacity}[transparent]")
-            overlay_input = "[transparent]"
-        else:
-            filter_parts.append(f"[1:v]format=rgba,colorchannelmixer=aa={opacity}[transparent]")
-            overlay_input = "[transparent]"
+        image_filters.append(f"format=rgba,colorchannelmixer=aa={opacity}")
+    
+    if image_filters:
+        filter_parts.append(f"[1:v]{','.join(image_filters)}[ovl]")
+        overlay_input = "[ovl]"
+    else:
+        # Nothing to do to the image, feed it straight into the overlay
+        overlay_input = "[1:v]"
     
     # Get position
     position_filter = get_position_filter(position, offset_x, offset_y)
@@ -160,11 +226,12 @@ def overlay_image_on_video(
     overlay_options = []
     if start_time:
         # Convert time to seconds for enable option
-        overlay_options.append(f"enable='gte(t,{parse_time_to_seconds(start_time)})'")
-    
-    if duration and start_time:
-        end_time = parse_time_to_seconds(start_time) + parse_time_to_seconds(duration)
-        overlay_options.append(f"enable='between(t,{parse_time_to_seconds(start_time)},{end_time})'")
+        start_seconds = parse_time_to_seconds(start_time)
+        if duration:
+            end_seconds = start_seconds + parse_time_to_seconds(duration)
+            overlay_options.append(f"enable='between(t,{start_seconds},{end_seconds})'")
+        else:
+            overlay_options.append(f"enable='gte(t,{start_seconds})'")
     
     # Build overlay filter
     overlay_filter = f"[0:v]{overlay_input}overlay={position_filter}"
@@ -176,13 +243,38 @@ def overlay_image_on_video(
     # Combine all filters
     filter_complex = ";".join(filter_parts)
     
-    # Build ffmpeg command
+    # Pick a hardware encoder if requested, falling back to ffmpeg's default
+    hw_encoder = None
+    if hw_encode:
+        output_ext = os.path.splitext(output_path)[1].lower()
+        if output_ext not in H264_CONTAINER_EXTENSIONS:
+            print(f"Hardware encoders produce H.264, which '{output_ext}' output can't hold, "
+                  "using software encoding")
+        else:
+            hw_encoder = detect_hw_encoder()
+            if hw_encoder:
+                print(f"Hardware encoder: {hw_encoder[0]}")
+            else:
+                print("No usable hardware encoder found, using software encoding")
+    
+    # Build ffmpeg command, running the filter graph on all CPU cores
     cmd = [
-        'ffmpeg',
+        get_ffmpeg_path() or 'ffmpeg',
+        '-filter_complex_threads', str(os.cpu_count() or 1),
+    ]
+    if hw_encoder:
+        cmd += ['-hwaccel', 'auto']  # Decode on the GPU where supported
+    cmd += [
         '-i', str(video_file),
         '-i', str(image_file),
         '-filter_complex', filter_complex,
         '-c:a', 'copy',  # Copy audio without re-encoding
+        '-threads', '0',  # Let ffmpeg pick the encoder thread count
+    ]
+    if hw_encoder:
+        encoder, encoder_options = hw_encoder
+        cmd += ['-c:v', encoder] + encoder_options
+    cmd += [
         '-y',  # Overwrite output file if it exists
         output_path
     ]
@@ -191,14 +283,14 @@ def overlay_image_on_video(
     print(f"Command: {' '.join(cmd)}")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        returncode, error_output = run_ffmpeg(cmd)
         
-        if result.returncode == 0:
+        if returncode == 0:
             print(f"\n✅ Successfully created video with overlay: {output_path}")
             return True
         else:
             print(f"\n❌ Error during overlay:")
-            print(f"Error output: {result.stderr}")
+            print(f"Error output: {error_output}")
             return False
             
     except Exception as e:
@@ -206,6 +298,7 @@ def overlay_image_on_video(
         return False
 
 
+@functools.lru_cache(maxsize=16)
 def parse_time_to_seconds(time_str: str) -> float:
     """
     Parse time string (HH:MM:SS or MM:SS or SS) to seconds.
@@ -227,6 +320,9 @@ def parse_time_to_seconds(time_str: str) -> float:
 
 def main():
     """Main function to handle command line arguments and execute overlay."""
+    # Only needed for the command line, so keep it out of module import
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Overlay an image (watermark/logo) onto a video",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -308,6 +404,12 @@ Examples:
         help='Duration of overlay (format: HH:MM:SS, MM:SS, or SS)'
     )
     
+    parser.add_argument(
+        '--hw-encode',
+        action='store_true',
+        help='Use a GPU hardware encoder (NVENC, Quick Sync, VideoToolbox) when available'
+    )
+    
     args = parser.parse_args()
     
     # Validate opacity
@@ -349,7 +451,8 @@ Examples:
             offset_x=args.offset_x,
             offset_y=args.offset_y,
             start_time=args.start_time,
-            duration=args.duration
+            duration=args.duration,
+            hw_encode=args.hw_encode
         )
         
         if success: